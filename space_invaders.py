@@ -5,6 +5,71 @@ import random
 import sys
 import pygame
 import sys
+import argparse
+import tracemalloc
+import gc
+import weakref
+import os
+import json
+import struct
+import heapq
+import queue
+import threading
+import time
+import io
+import mmap
+from collections import deque, namedtuple
+
+try:
+    import numpy as np   # optional: only the batched effects engine needs it
+except ImportError:
+    np = None
+
+# ---------------------------
+# Command-line options
+# ---------------------------
+# parse_known_args so anything we don't recognize (e.g. IDE flags) is ignored
+arg_parser = argparse.ArgumentParser(description="Space Invaders")
+arg_parser.add_argument("--track-memory", action="store_true",
+                        help="count live sprites/Surfaces between rounds and trace allocations before each sample")
+arg_parser.add_argument("--memory-sample-rounds", type=int, default=5,
+                        help="print a memory sample every N rounds (with --track-memory)")
+arg_parser.add_argument("--data-dir", default="data",
+                        help="where round telemetry and the high-score table are stored")
+arg_parser.add_argument("--no-telemetry", action="store_true",
+                        help="don't record rounds or high scores")
+arg_parser.add_argument("--top-scores", type=int, metavar="N",
+                        help="print the N best recorded rounds per difficulty and exit")
+arg_parser.add_argument("--difficulty", type=str.upper, metavar="NAME",
+                        help="with --top-scores, only list this difficulty")
+arg_parser.add_argument("--low-latency", action="store_true",
+                        help="precise frame pacing and late input sampling")
+arg_parser.add_argument("--uncapped", action="store_true",
+                        help="don't cap the frame rate; the game itself still ticks at a fixed rate")
+arg_parser.add_argument("--vsync", action="store_true",
+                        help="ask the display for vsync (uses a SCALED window)")
+arg_parser.add_argument("--show-latency", action="store_true",
+                        help="show input-to-present latency on the HUD")
+arg_parser.add_argument("--pipelined", action="store_true",
+                        help="run the simulation on its own thread, one tick ahead of drawing")
+arg_parser.add_argument("--swarm", action="store_true",
+                        help="preselect the SWARM stress mode on the difficulty menu")
+arg_parser.add_argument("--swarm-rows", type=int, default=30, help="alien rows in SWARM mode")
+arg_parser.add_argument("--swarm-cols", type=int, default=60, help="alien columns in SWARM mode")
+arg_parser.add_argument("--swarm-bullets", type=int, default=300,
+                        help="max alien bullets on screen in SWARM mode")
+arg_parser.add_argument("--swarm-cooldown", type=int, default=20,
+                        help="ms between alien volleys in SWARM mode")
+arg_parser.add_argument("--swarm-ufos", type=int, default=3, help="max UFOs on screen in SWARM mode")
+arg_parser.add_argument("--show-perf", action="store_true",
+                        help="show frame time / tick rate on the HUD (always on in SWARM mode)")
+arg_parser.add_argument("--build-bundle", action="store_true",
+                        help="pack img/ into img/assets.bundle and exit")
+arg_parser.add_argument("--no-bundle", action="store_true",
+                        help="ignore img/assets.bundle and load the loose files")
+arg_parser.add_argument("--sprite-explosions", action="store_true",
+                        help="use one Explosion sprite per explosion instead of the NumPy effects engine")
+ARGS, _ = arg_parser.parse_known_args()
 
 # ---------------------------
 # Pygame initialization
@@ -13,6 +78,238 @@ pygame.mixer.pre_init(44100, -16, 2, 512)  # Preconfigure audio: sample rate, bi
 mixer.init()                               # Start pygame's sound mixer so sounds work
 pygame.init()                              # Initialize all imported pygame modules
 
+# ---------------------------
+# Asset loading (bundle or loose files)
+# ---------------------------
+# Every image / sound / font goes through the loaders below. They cache what
+# they load, so each file is read, decoded, scaled and converted once and the
+# resulting Surface is shared by every sprite that uses it (never draw on one).
+#
+# The fast path is img/assets.bundle, made by `python space_invaders.py
+# --build-bundle`. It holds, uncompressed:
+#   - one RGBA atlas with every sprite and the pre-scaled explosion frames
+#   - the background, already scaled to the window size
+#   - the sounds as raw PCM in the mixer's format
+#   - img/pixel_font.ttf, if there is one
+# The game memory-maps it, so there's no PNG/WAV decoding and only one file
+# to open. If the bundle is missing (or --no-bundle), or out of date (a
+# source file's size / mtime or the window size changed since it was
+# built), the loose files in img/ are used instead.
+#
+# Bundle layout: BUNDLE_MAGIC, BUNDLE_HEADER (version, index length), a JSON
+# index, then the data blobs. Index offsets are relative to the first blob.
+BUNDLE_PATH = "img/assets.bundle"
+BUNDLE_MAGIC = b"SIBUNDLE"
+BUNDLE_VERSION = 2
+BUNDLE_HEADER = struct.Struct("<II")
+ATLAS_W = 1024                # atlas width; height grows to fit
+
+SPRITE_NAMES = [
+    "spaceship", "bullet", "alien_bullet",
+    "alien1", "alien2", "alien3", "alien4", "alien5",
+]
+EXPLOSION_FRAMES = 5          # exp1.png .. exp5.png
+EXPLOSION_SIZES = {1: 20, 2: 40, 3: 120}   # Explosion size -> frame width/height in px
+EXPLOSION_SPEED = 3           # ticks per explosion frame (lower = faster animation)
+SOUND_NAMES = ["explosion", "explosion2", "laser"]
+FONT_PATH = "img/pixel_font.ttf"
+
+bundle_data = None            # the mmap of the bundle (None = use loose files)
+bundle_index = None           # the bundle's parsed JSON index
+bundle_atlas = None           # the atlas Surface, made on first use
+image_cache = {}              # name -> Surface
+mask_cache = {}               # name -> Mask
+sound_cache = {}              # name -> Sound
+
+def explosion_frame_name(num, size):
+    """Name of explosion frame num (1-5) pre-scaled for Explosion size."""
+    return f"exp{num}@{EXPLOSION_SIZES[size]}"
+
+def load_loose_image(name):
+    """Decode one image from img/ the slow way (also what the bundle is built from)."""
+    if name == "bg":
+        return pygame.transform.scale(pygame.image.load("img/bg.png"), (SCREEN_W, SCREEN_H))
+    if "@" in name:
+        base, px = name.split("@")
+        return pygame.transform.scale(pygame.image.load(f"img/{base}.png"), (int(px), int(px)))
+    return pygame.image.load(f"img/{name}.png")
+
+def bundle_sources():
+    """
+    {path: [size, mtime_ns]} for every loose file the bundle is built from,
+    so a stale bundle can be spotted at startup.
+    """
+    paths = [f"img/{name}.png" for name in SPRITE_NAMES]
+    paths += [f"img/exp{num}.png" for num in range(1, EXPLOSION_FRAMES + 1)]
+    paths += ["img/bg.png"] + [f"img/{name}.wav" for name in SOUND_NAMES]
+    if os.path.exists(FONT_PATH):
+        paths.append(FONT_PATH)
+    stamps = {}
+    for path in paths:
+        st = os.stat(path)
+        stamps[path] = [st.st_size, st.st_mtime_ns]
+    return stamps
+
+def build_bundle():
+    """Pack everything in img/ into BUNDLE_PATH (the --build-bundle step)."""
+    blobs = []
+    offset = 0
+
+    def add_blob(data):
+        nonlocal offset
+        start = offset
+        blobs.append(data)
+        offset += len(data)
+        return {"offset": start, "length": len(data)}
+
+    # Shelf-pack sprites into the atlas: tallest first, left to right,
+    # a new shelf when a row is full. 1px gap between regions.
+    names = SPRITE_NAMES + [explosion_frame_name(num, size)
+                            for size in EXPLOSION_SIZES for num in range(1, EXPLOSION_FRAMES + 1)]
+    images = {name: load_loose_image(name) for name in names}
+    regions = {}
+    x = y = shelf_h = 0
+    for name in sorted(names, key=lambda n: -images[n].get_height()):
+        w, h = images[name].get_size()
+        if x + w > ATLAS_W:
+            x, y, shelf_h = 0, y + shelf_h + 1, 0
+        regions[name] = [x, y, w, h]
+        x += w + 1
+        shelf_h = max(shelf_h, h)
+    atlas = pygame.Surface((ATLAS_W, y + shelf_h), pygame.SRCALPHA)
+    for name, rect in regions.items():
+        atlas.blit(images[name], rect[:2])
+    index = {"atlas": dict(add_blob(pygame.image.tobytes(atlas, "RGBA")),
+                           size=atlas.get_size(), regions=regions)}
+
+    # Background is opaque, so RGB is enough
+    bg_img = load_loose_image("bg")
+    index["bg"] = dict(add_blob(pygame.image.tobytes(bg_img, "RGB")), size=bg_img.get_size())
+
+    # Sounds as raw samples; only valid for the mixer format they were decoded with
+    index["mixer"] = list(pygame.mixer.get_init())
+    index["sounds"] = {name: add_blob(pygame.mixer.Sound(f"img/{name}.wav").get_raw())
+                       for name in SOUND_NAMES}
+
+    if os.path.exists(FONT_PATH):
+        with open(FONT_PATH, "rb") as f:
+            index["font"] = add_blob(f.read())
+
+    index["sources"] = bundle_sources()
+    index["screen_size"] = [SCREEN_W, SCREEN_H]
+
+    index_bytes = json.dumps(index).encode("utf-8")
+    with open(BUNDLE_PATH + ".tmp", "wb") as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(BUNDLE_HEADER.pack(BUNDLE_VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(BUNDLE_PATH + ".tmp", BUNDLE_PATH)
+    print(f"wrote {BUNDLE_PATH}: {len(regions)} atlas regions, "
+          f"{len(index['sounds'])} sounds, {os.path.getsize(BUNDLE_PATH) // 1024} KiB")
+
+def open_bundle():
+    """Memory-map BUNDLE_PATH if it's there and valid; otherwise stay on loose files."""
+    global bundle_data, bundle_index
+    if ARGS.no_bundle or not os.path.exists(BUNDLE_PATH):
+        return
+    data = None
+    try:
+        with open(BUNDLE_PATH, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        start = len(BUNDLE_MAGIC)
+        version, index_len = BUNDLE_HEADER.unpack_from(data, start)
+        if data[:start] != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            raise ValueError("not a current asset bundle")
+        start += BUNDLE_HEADER.size
+        index = json.loads(bytes(data[start:start + index_len]))
+        index["data_start"] = start + index_len
+
+        # Stale bundle: the window size or a source file changed since --build-bundle
+        if index["screen_size"] != [SCREEN_W, SCREEN_H]:
+            raise ValueError("built for a different window size, rerun --build-bundle")
+        sources = bundle_sources()
+        changed = sorted(set(sources) ^ set(index["sources"]) |
+                         {path for path in sources if sources[path] != index["sources"].get(path)})
+        if changed:
+            raise ValueError(f"out of date ({', '.join(changed)} changed), rerun --build-bundle")
+    except (OSError, ValueError, struct.error) as e:
+        print(f"[assets] {BUNDLE_PATH} unusable ({e}), loading loose files")
+        if data is not None:
+            data.close()  # nothing has a view into it yet
+        return
+    bundle_data, bundle_index = data, index
+
+def bundle_blob(entry):
+    """Zero-copy view of one blob in the mapped bundle."""
+    start = bundle_index["data_start"] + entry["offset"]
+    return memoryview(bundle_data)[start:start + entry["length"]]
+
+def load_image(name):
+    """
+    Shared, display-converted Surface for an image name: "spaceship",
+    "alien1", "bg", "exp3@40" (frame 3 scaled to 40px) ...
+    Needs the display to exist (for convert).
+    """
+    img = image_cache.get(name)
+    if img is not None:
+        return img
+    global bundle_atlas
+    if bundle_index is not None and name == "bg":
+        img = pygame.image.frombuffer(bundle_blob(bundle_index["bg"]), bundle_index["bg"]["size"], "RGB")
+    elif bundle_index is not None and name in bundle_index["atlas"]["regions"]:
+        if bundle_atlas is None:
+            atlas = bundle_index["atlas"]
+            bundle_atlas = pygame.image.frombuffer(bundle_blob(atlas), atlas["size"], "RGBA")
+        # (the convert below copies the region out of the mapped atlas)
+        img = bundle_atlas.subsurface(bundle_index["atlas"]["regions"][name])
+    else:
+        img = load_loose_image(name)
+    # Convert to the screen's pixel format once, so blits don't convert every frame
+    img = img.convert() if name == "bg" else img.convert_alpha()
+    image_cache[name] = img
+    return img
+
+def load_mask(name):
+    """Shared collision mask for an image name (see load_image)."""
+    mask = mask_cache.get(name)
+    if mask is None:
+        mask = mask_cache[name] = pygame.mask.from_surface(load_image(name))
+    return mask
+
+def explosion_frames(size):
+    """The EXPLOSION_FRAMES Surfaces for an Explosion of this size (1, 2 or 3)."""
+    return [load_image(explosion_frame_name(num, size)) for num in range(1, EXPLOSION_FRAMES + 1)]
+
+def load_sound(name):
+    """Shared Sound for a name in SOUND_NAMES (raw PCM from the bundle if it matches the mixer)."""
+    sound = sound_cache.get(name)
+    if sound is not None:
+        return sound
+    if bundle_index is not None and tuple(bundle_index["mixer"]) == pygame.mixer.get_init():
+        sound = pygame.mixer.Sound(buffer=bundle_blob(bundle_index["sounds"][name]))
+    else:
+        sound = pygame.mixer.Sound(f"img/{name}.wav")
+    sound_cache[name] = sound
+    return sound
+
+def font_source():
+    """Where to load the pixel font from: the bundle, the loose .ttf, or None."""
+    if bundle_index is not None:
+        if "font" in bundle_index:
+            return io.BytesIO(bundle_blob(bundle_index["font"]))
+        return None
+    return FONT_PATH if os.path.exists(FONT_PATH) else None
+
+def preload_assets():
+    """Load every image / mask up front so the first explosion doesn't hitch."""
+    for name in SPRITE_NAMES:
+        load_mask(name)
+    for size in EXPLOSION_SIZES:
+        explosion_frames(size)
+
+
 # ---------------------------
 # Basic window / timing setup
 # ---------------------------
@@ -22,19 +319,187 @@ FPS = 60                     # Target frames per second
 # We'll run in 4:3 aspect ratio, classic arcade style
 SCREEN_W = 800
 SCREEN_H = 600
-screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))  # Main game surface
+
+# Build step: pack img/ into the asset bundle and exit (no window needed)
+if ARGS.build_bundle:
+    build_bundle()
+    sys.exit()
+
+# Use the asset bundle if there's an up-to-date one
+open_bundle()
+
+if ARGS.vsync:
+    # SDL only honors vsync for SCALED / OPENGL windows
+    try:
+        screen = pygame.display.set_mode((SCREEN_W, SCREEN_H), pygame.SCALED, vsync=1)
+    except pygame.error as e:
+        print(f"[display] vsync not available ({e}), opening a normal window without it")
+        screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+else:
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))  # Main game surface
 pygame.display.set_caption("Space Invaders")            # Window title
 
+# ---------------------------
+# Frame pacing + input latency
+# ---------------------------
+# Normal mode: clock.tick(FPS), which sleeps with SDL_Delay and can
+# oversleep by a few ms.
+# Low-latency mode (--low-latency): sleep until just before the frame
+# deadline, then spin the last SPIN_SECS so the frame starts on time, and
+# re-pump events right before the ship reads the keyboard.
+# --uncapped skips the wait entirely (the display's vsync paces us, if on),
+# but gameplay still only advances in fixed 1/FPS ticks (see tick_due), so
+# a faster display draws more frames of the same game, not a faster game.
+#
+# Latency is measured from the moment input was last sampled to the moment
+# display.update() returns (when SDL hands the frame to the display).
+LOW_LATENCY = ARGS.low_latency
+UNCAPPED = ARGS.uncapped
+SHOW_LATENCY = ARGS.show_latency
+PIPELINED = ARGS.pipelined          # see "Simulation thread" below
+FRAME_SECS = 1 / FPS
+SPIN_SECS = 0.002                 # busy-wait this much at the end of each frame
+
+next_frame_at = time.perf_counter()   # deadline for the next frame (low-latency mode)
+next_tick_at = time.perf_counter()    # when the next simulation tick is due (--uncapped)
+MAX_CATCHUP_TICKS = 5                 # after a stall, run at most this many ticks back to back
+last_render_list = None               # newest simulated tick, redrawn between ticks (--uncapped)
+input_sampled_at = None               # perf_counter() when input was last read
+class LatencyHistogram:
+    """
+    Running summary of latencies in fixed 0.1 ms buckets, so a kiosk that
+    runs for days keeps a constant-size record instead of a growing list.
+    summary() gives the same keys as frame_time_summary().
+    """
+    BUCKET_MS = 0.1
+    BUCKETS = 2000                    # up to 200 ms; slower frames land in the last bucket
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.counts = [0] * self.BUCKETS
+        self.frames = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[min(self.BUCKETS - 1, int(ms / self.BUCKET_MS))] += 1
+        self.frames += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        """Upper edge of the bucket holding the p-th fraction of frames."""
+        target = min(self.frames - 1, int(self.frames * p))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen > target:
+                return round((bucket + 1) * self.BUCKET_MS, 2)
+        return round(self.max, 2)
+
+    def summary(self):
+        if not self.frames:
+            return {}
+        return {
+            "frames": self.frames,
+            "mean": round(self.total / self.frames, 2),
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 2),
+        }
+
+latency_window = deque(maxlen=FPS)    # last second of latencies (ms), for the HUD
+round_latencies = LatencyHistogram()  # gameplay frames since the countdown ended, for telemetry
+session_latencies = LatencyHistogram()  # whole session, printed on exit (if asked for)
+
+# Frame time / tick rate, for the perf HUD (--show-perf, always on in SWARM)
+SHOW_PERF = ARGS.show_perf
+frame_window = deque(maxlen=FPS)      # last second of frame times (ms)
+# Simulation tick rate. Only simulate_tick writes these (possibly on the
+# simulation thread); the HUD only reads tick_rate, a plain number.
+tick_rate = 0.0                       # ticks/s over the last full second
+tick_rate_start = time.perf_counter() # start of the current one-second window
+tick_rate_count = 0                   # ticks so far in the current window
+
+def pace_frame():
+    """Wait for the next frame slot and return ms since the previous frame."""
+    global next_frame_at
+    if UNCAPPED:
+        return clock.tick()
+    if not LOW_LATENCY:
+        return clock.tick(FPS)
+
+    # Schedule from the previous deadline so we don't drift,
+    # but don't try to catch up if we fell behind
+    next_frame_at = max(next_frame_at + FRAME_SECS, time.perf_counter())
+    remaining = next_frame_at - time.perf_counter()
+    if remaining > SPIN_SECS:
+        time.sleep(remaining - SPIN_SECS)
+    while time.perf_counter() < next_frame_at:
+        pass
+    return clock.tick()  # no limit, just measures the frame time
+
+def tick_due():
+    """
+    --uncapped: True if the next fixed 1/FPS simulation tick is due
+    (and schedules the one after it). Called until it returns False,
+    this runs as many ticks as real time calls for.
+    """
+    global next_tick_at
+    now = time.perf_counter()
+    if now < next_tick_at:
+        return False
+    # Schedule from the previous tick so we don't drift, but
+    # don't try to catch up on more than a few missed ticks
+    next_tick_at = max(next_tick_at + FRAME_SECS, now - MAX_CATCHUP_TICKS * FRAME_SECS)
+    return True
+
+def sample_input():
+    """
+    Return when the keyboard state the game is about to read was sampled.
+    In low-latency mode, pull in pending OS input first. Only the main
+    thread may pump events, so in pipelined mode the simulation thread
+    reads whatever the main thread's last pump left behind.
+    """
+    global input_sampled_at
+    if LOW_LATENCY and not PIPELINED:
+        pygame.event.pump()
+        input_sampled_at = time.perf_counter()
+    return input_sampled_at
+
+def present(sampled_at=None):
+    """
+    Show the finished frame and record input-to-present latency.
+    sampled_at is when the input behind this frame was read
+    (defaults to the last event drain).
+    """
+    pygame.display.update()
+    if sampled_at is None:
+        sampled_at = input_sampled_at
+    if sampled_at is not None:
+        latency = (time.perf_counter() - sampled_at) * 1000
+        latency_window.append(latency)
+        if game_state == STATE_GAME:
+            round_latencies.add(latency)
+        if LOW_LATENCY or SHOW_LATENCY:
+            session_latencies.add(latency)
+
 # ---------------------------
 # Font loading helper
 # ---------------------------
 def load_pixel_font(size):
     """
-    Try to load a pixel-style font from img/pixel_font.ttf.
+    Try to load a pixel-style font from img/pixel_font.ttf (or the bundle).
     If that fails (file missing), fall back to Courier bold.
     """
     try:
-        return pygame.font.Font("img/pixel_font.ttf", size)
+        source = font_source()
+        if source is None:
+            raise FileNotFoundError(FONT_PATH)
+        return pygame.font.Font(source, size)
     except:
         return pygame.font.SysFont("Courier", size, bold=True)
 
@@ -48,14 +513,14 @@ font48 = load_pixel_font(48)
 # ---------------------------
 # Load sounds
 # ---------------------------
-# We assume these WAV files exist in img/
-explosion_fx = pygame.mixer.Sound("img/explosion.wav")   # Player bullet hits alien / UFO
+# We assume these WAV files exist in img/ (or in the bundle)
+explosion_fx = load_sound("explosion")    # Player bullet hits alien / UFO
 explosion_fx.set_volume(0.25)
 
-explosion2_fx = pygame.mixer.Sound("img/explosion2.wav") # Alien bullet hits player
+explosion2_fx = load_sound("explosion2")  # Alien bullet hits player
 explosion2_fx.set_volume(0.25)
 
-laser_fx = pygame.mixer.Sound("img/laser.wav")           # Player laser fire
+laser_fx = load_sound("laser")            # Player laser fire
 laser_fx.set_volume(0.25)
 
 # ---------------------------
@@ -72,8 +537,32 @@ BLACK = (0, 0, 0)
 ROWS = 5              # number of alien rows
 COLS = 7              # number of alien columns
 ALIEN_COOLDOWN = 900  # ms between alien shots
+ALIEN_BULLET_LIMIT = 4 # max alien bullets on screen at once
 UFO_COOLDOWN   = 6000 # ms between potential UFO spawns
 UFO_SPEED      = 2    # UFO horizontal speed (slow, drifts across top)
+UFO_LIMIT      = 1    # max UFOs on screen at once
+UFO_LANES      = [50, 25, 75]  # UFO heights; extra UFOs take the next lane
+
+# Area the alien formation starts in. The classic 5x7 grid uses its natural
+# spacing; bigger formations are squeezed (and the sprites shrunk) to fit.
+FORMATION_X = 120     # center x of the first column
+FORMATION_Y = 100     # center y of the first row
+FORMATION_W = 560     # width available for all columns
+FORMATION_H = 250     # height available for all rows
+ALIEN_X_GAP = 70      # column spacing when there's room
+ALIEN_Y_GAP = 50      # row spacing when there's room
+
+# "SWARM" stress mode: thousands of aliens, hundreds of alien bullets,
+# several UFOs. Picked from the difficulty menu (or --swarm); sizes come
+# from the command line.
+SWARM_ROWS           = max(1, ARGS.swarm_rows)
+SWARM_COLS           = max(1, ARGS.swarm_cols)
+SWARM_BULLET_LIMIT   = max(1, ARGS.swarm_bullets)
+SWARM_ALIEN_COOLDOWN = max(0, ARGS.swarm_cooldown)
+SWARM_ALIEN_VOLLEY   = 4      # aliens that fire together each volley
+SWARM_UFO_LIMIT      = max(1, ARGS.swarm_ufos)
+SWARM_UFO_COOLDOWN   = 1500
+SWARM_SHIP_HEALTH    = 100    # so the ship survives long enough to measure anything
 
 PLAYER_COOLDOWN = 500 # ms between player shots
 PLAYER_SPEED    = 6   # how fast player moves left/right
@@ -104,22 +593,27 @@ game_state = STATE_TITLE         # start on title/legend screen
 game_over_reason = None          # "win" or "lose" so we can show right message
 
 # Difficulty options
-difficulties = ["EASY", "MEDIUM", "HARD"]
-diff_index = 0  # 0 = EASY, 1 = MEDIUM, 2 = HARD
+difficulties = ["EASY", "MEDIUM", "HARD", "SWARM"]
+diff_index = 0  # 0 = EASY, 1 = MEDIUM, 2 = HARD, 3 = SWARM
+if ARGS.swarm:
+    diff_index = difficulties.index("SWARM")
 
 # Horizontal step size for alien block movement by difficulty.
 # This controls how FAR the invaders move left/right each "step".
 alien_move_speed_by_diff = {
     "EASY":   9,
     "MEDIUM": 12,
-    "HARD":   30
+    "HARD":   30,
+    "SWARM":  6,
 }
 
 # ---------------------------
 # Background image
 # ---------------------------
-bg = pygame.image.load("img/bg.png")                    # background art
-bg = pygame.transform.scale(bg, (SCREEN_W, SCREEN_H))   # scale bg to fit window
+bg = load_image("bg")   # background art, already scaled to fit the window
+
+# Decode / convert every sprite now rather than on first use
+preload_assets()
 
 def draw_bg():
     """Draw the background image each frame."""
@@ -145,6 +639,34 @@ def draw_text_topleft(text, font, color, x, y):
     screen.blit(img, rect)
     return rect
 
+def draw_latency_hud():
+    """Top-right: last and 1-second average input-to-present latency (--show-latency)."""
+    if not SHOW_LATENCY or not latency_window:
+        return
+    avg = sum(latency_window) / len(latency_window)
+    text = f"LAT {latency_window[-1]:4.1f}MS  AVG {avg:4.1f}MS"
+    img = font16.render(text, True, WHITE)
+    screen.blit(img, img.get_rect(topright=(SCREEN_W - 20, 20)))
+
+def draw_perf_hud(counts):
+    """
+    Bottom-left: frame rate, frame time (avg / worst over the last second),
+    simulation ticks per second and entity counts. Shown with --show-perf
+    and always in SWARM mode, so we can see where things stop scaling.
+    counts is the RenderList's snapshot, so nothing here iterates over
+    data the simulation thread may be changing.
+    """
+    if not (SHOW_PERF or difficulties[diff_index] == "SWARM") or not frame_window:
+        return
+    aliens, bullets, ufos, fx = counts
+    avg = sum(frame_window) / len(frame_window)
+    text = (f"FPS {clock.get_fps():3.0f}  FRAME {avg:4.1f}/{max(frame_window)}MS  "
+            f"TICKS/S {tick_rate:3.0f}  ALIENS {aliens}  "
+            f"BULLETS {bullets}  UFOS {ufos}")
+    if fx is not None:
+        text += "  FX {}/{}".format(*fx)
+    draw_text_topleft(text, font16, WHITE, 20, SCREEN_H - 24)
+
 # ---------------------------
 # Sprite groups (containers for all in-game entities)
 # ---------------------------
@@ -165,6 +687,9 @@ score = 0                                   # player score
 countdown = 3                                # "GET READY" countdown (3,2,1)
 last_count = pygame.time.get_ticks()         # timer to tick countdown down each second
 can_shoot = False                            # NEW: Player can't shoot until countdown ends
+player_dying = False                         # ship destroyed, death explosion still playing
+dying_ticks = 0                              # how long the death explosion has been playing
+DEATH_ANIMATION_TICKS = 2 * FPS              # GAME OVER shows after this even if effects remain
 
 # Alien formation movement control:
 alien_dir = 1                # 1 = moving right, -1 = moving left
@@ -172,16 +697,401 @@ alien_step_down = 16         # how far they drop vertically when bouncing off a
 alien_move_timer = 0         # frame counter for timing steps
 alien_move_delay = 20        # how many frames between horizontal movement "steps" (will be overridden per difficulty)
 
+# Alien / UFO fire limits (classic values, SWARM overrides them in reset_game)
+alien_cooldown = ALIEN_COOLDOWN
+alien_bullet_limit = ALIEN_BULLET_LIMIT
+alien_volley = 1             # aliens that fire together each time
+ufo_cooldown = UFO_COOLDOWN
+ufo_limit = UFO_LIMIT
+
+rounds_played = 0            # how many times reset_game has run this session
+
+# Per-round stats for telemetry (reset in reset_game)
+round_active = False         # True from reset_game until the round's record is sent
+round_start = pygame.time.get_ticks()  # when play started (end of countdown)
+shots_fired = 0              # player bullets fired this round
+round_hits = 0               # aliens / UFOs destroyed this round
+round_ticks = 0              # simulation ticks this round
+round_aliens = 0             # formation size at the start of the round
+round_frame_times = []       # ms per frame since the countdown ended
+
+# ---------------------------
+# Memory / sprite-lifecycle tracking (--track-memory)
+# ---------------------------
+# Each sprite registers itself in a WeakSet for its class, so counting live
+# objects costs nothing per frame: dead sprites just drop out of the set.
+# Surface pixel data lives in SDL's allocator (tracemalloc can't see it),
+# which is why we also count the distinct Surfaces the live sprites hold
+# (most are shared from the asset cache, so that's not one per sprite).
+# tracemalloc hooks every Python allocation and slows the whole game down,
+# so it only runs during the round right before each sample: whatever that
+# round allocated and is still holding on to at the sample is what leaks.
+MEMORY_TRACKING = ARGS.track_memory
+MEMORY_SAMPLE_ROUNDS = max(1, ARGS.memory_sample_rounds)
+MEMORY_TOP_SITES = 10        # how many allocation sites to print per sample
+
+sprite_groups = {
+    "spaceship":    spaceship_group,
+    "bullet":       bullet_group,
+    "alien":        alien_group,
+    "alien_bullet": alien_bullet_group,
+    "explosion":    explosion_group,
+    "ufo":          ufo_group,
+}
+
+live_sprites = {}        # class name -> WeakSet of live instances
+memory_history = []      # (round, retained bytes or None, live sprites, distinct surfaces) per sample
+
+def trace_next_round():
+    """Start tracemalloc if the round that's about to be played ends in a sample."""
+    if MEMORY_TRACKING and (rounds_played + 1) % MEMORY_SAMPLE_ROUNDS == 0:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+
+trace_next_round()
+
+def track_sprite(sprite):
+    """Register a new sprite so --track-memory can count it while it's alive."""
+    if MEMORY_TRACKING:
+        live_sprites.setdefault(type(sprite).__name__, weakref.WeakSet()).add(sprite)
+
+def sprite_surfaces(sprite):
+    """The Surfaces a sprite keeps alive (an Explosion refers to all its frames)."""
+    return getattr(sprite, "images", None) or [sprite.image]
+
+def sample_memory(round_num):
+    """
+    Print live sprite / Surface counts per class and group, the top sites
+    of allocations the traced round left behind, and the growth trend.
+    Stops tracemalloc again; reset_game restarts it before the next sample.
+    """
+    # Only collect here (between rounds), never per frame
+    gc.collect()
+
+    total_sprites = 0
+    all_surfaces = set()     # ids of distinct Surfaces (all alive, so ids are unique)
+    print(f"[memory] round {round_num}")
+    for name, alive in sorted(live_sprites.items()):
+        sprites = list(alive)
+        surfaces = {id(img) for sprite in sprites for img in sprite_surfaces(sprite)}
+        # Sprites that are alive but in no group are what a leak looks like
+        orphans = sum(1 for s in sprites if not s.alive())
+        total_sprites += len(sprites)
+        all_surfaces |= surfaces
+        print(f"[memory]   {name:<12} {len(sprites):6} live  {orphans:6} outside groups  {len(surfaces):6} surfaces")
+    total_surfaces = len(all_surfaces)
+    print(f"[memory]   {total_surfaces} distinct surfaces held by sprites, {len(image_cache)} in the asset cache")
+    for name, group in sprite_groups.items():
+        print(f"[memory]   group {name:<12} {len(group):6}")
+    if effects is not None:
+        explosions, debris = effects.counts()
+        print(f"[memory]   effects: {explosions}/{EFFECTS_CAPACITY} explosions, "
+              f"{debris}/{DEBRIS_CAPACITY} debris (preallocated)")
+
+    # Everything still traced was allocated since tracing started (the
+    # previous round) and hasn't been freed yet
+    retained = None
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"[memory]   last round left {retained / 1024:.1f} KiB allocated "
+              f"(peak {peak / 1024:.1f} KiB), top sites:")
+        for stat in snapshot.statistics("lineno")[:MEMORY_TOP_SITES]:
+            print(f"[memory]     {stat}")
+    memory_history.append((round_num, retained, total_sprites, total_surfaces))
+
+    # Growth trend: average change per round since the first sample
+    first_round, _, first_sprites, first_surfaces = memory_history[0]
+    rounds = round_num - first_round
+    if rounds > 0:
+        print(f"[memory]   trend: {(total_sprites - first_sprites) / rounds:+.2f} sprites/round, "
+              f"{(total_surfaces - first_surfaces) / rounds:+.2f} surfaces/round")
+    retained_all = [r for _, r, _, _ in memory_history if r is not None]
+    if len(retained_all) > 1:
+        print(f"[memory]   traced rounds left {sum(retained_all) / len(retained_all) / 1024:.1f} KiB "
+              f"each on average over {len(retained_all)} samples")
+
+# ---------------------------
+# Session telemetry + high-score store
+# ---------------------------
+# Every finished round produces one telemetry record (JSON line) and one
+# high-score record. The game loop only puts them on a queue; a background
+# thread writes them to disk in batches, so file I/O never lands on a frame.
+#
+# High scores are kept in two files inside --data-dir:
+#   highscores.bin  fixed-size packed records, append-only (record N is at N * size)
+#   highscores.idx  the top SCORE_INDEX_SIZE (score, record number) pairs per
+#                   difficulty, rewritten after each batch, so top-N queries
+#                   never have to scan millions of rounds
+TELEMETRY_ENABLED = not ARGS.no_telemetry
+DATA_DIR = ARGS.data_dir
+TELEMETRY_PATH = os.path.join(DATA_DIR, "telemetry.jsonl")
+SCORES_PATH = os.path.join(DATA_DIR, "highscores.bin")
+SCORE_INDEX_PATH = os.path.join(DATA_DIR, "highscores.idx")
+
+TELEMETRY_BATCH_SIZE = 64     # max records per disk write
+TELEMETRY_FLUSH_SECS = 1.0    # how long the writer waits to fill a batch
+SCORE_INDEX_SIZE = 100        # top-N kept in the index per difficulty
+HIGH_SCORES_SHOWN = 5         # rows on the game over screen
+
+# score, difficulty code, reason code, 2 pad bytes, duration (s), unix time
+SCORE_RECORD = struct.Struct("<IBBxxfd")
+SCORE_INDEX_MAGIC = b"SIHS"
+SCORE_INDEX_HEADER = struct.Struct("<4sHHI")  # magic, index size, difficulties, record count
+SCORE_INDEX_COUNT = struct.Struct("<H")
+SCORE_INDEX_ENTRY = struct.Struct("<II")      # score, record number
+
+REASON_CODES = ["win", "lose", "quit"]
+
+def rebuild_score_index(n_difficulties):
+    """Scan highscores.bin and rebuild the per-difficulty top-N from scratch."""
+    index = [[] for _ in range(n_difficulties)]
+    record_count = 0
+    if os.path.exists(SCORES_PATH):
+        with open(SCORES_PATH, "rb") as f:
+            data = f.read()
+        data = data[:len(data) - len(data) % SCORE_RECORD.size]  # drop a torn last write
+        for record_no, (score, diff, _, _, _) in enumerate(SCORE_RECORD.iter_unpack(data)):
+            if diff < n_difficulties:
+                index[diff].append((score, record_no))
+            record_count = record_no + 1
+    index = [heapq.nlargest(SCORE_INDEX_SIZE, entries) for entries in index]
+    return index, record_count
+
+def load_score_index(n_difficulties):
+    """
+    Return (index, record_count) where index[difficulty] is a list of
+    (score, record number), best first. Falls back to a rebuild if the
+    index is missing, corrupt or behind highscores.bin.
+    """
+    try:
+        with open(SCORE_INDEX_PATH, "rb") as f:
+            data = f.read()
+        magic, size, n_stored, record_count = SCORE_INDEX_HEADER.unpack_from(data, 0)
+        records_on_disk = os.path.getsize(SCORES_PATH) // SCORE_RECORD.size
+        if magic != SCORE_INDEX_MAGIC or size != SCORE_INDEX_SIZE or record_count != records_on_disk:
+            raise ValueError("stale high-score index")
+        offset = SCORE_INDEX_HEADER.size
+        index = [[] for _ in range(max(n_difficulties, n_stored))]
+        for diff in range(n_stored):
+            (count,) = SCORE_INDEX_COUNT.unpack_from(data, offset)
+            offset += SCORE_INDEX_COUNT.size
+            for _ in range(count):
+                index[diff].append(SCORE_INDEX_ENTRY.unpack_from(data, offset))
+                offset += SCORE_INDEX_ENTRY.size
+        return index, record_count
+    except (OSError, ValueError, struct.error):
+        return rebuild_score_index(n_difficulties)
+
+def save_score_index(index, record_count):
+    """Write the index to a temp file and swap it in, so a crash never leaves half a file."""
+    parts = [SCORE_INDEX_HEADER.pack(SCORE_INDEX_MAGIC, SCORE_INDEX_SIZE, len(index), record_count)]
+    for entries in index:
+        parts.append(SCORE_INDEX_COUNT.pack(len(entries)))
+        parts.extend(SCORE_INDEX_ENTRY.pack(score, record_no) for score, record_no in entries)
+    tmp_path = SCORE_INDEX_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(tmp_path, SCORE_INDEX_PATH)
+
+def query_top_scores(n, difficulty):
+    """
+    Top n rounds for a difficulty name, best first, as dicts.
+    Served from the index when n fits in it, otherwise by one scan of
+    highscores.bin. Reads from disk: call it from tools, not the frame loop.
+    """
+    if not os.path.exists(SCORES_PATH):
+        return []
+    diff = difficulties.index(difficulty)
+    index, _ = load_score_index(len(difficulties))
+    entries = index[diff] if diff < len(index) else []
+    with open(SCORES_PATH, "rb") as f:
+        if n <= SCORE_INDEX_SIZE:
+            rows = []
+            for _, record_no in entries[:n]:
+                f.seek(record_no * SCORE_RECORD.size)
+                rows.append(SCORE_RECORD.unpack(f.read(SCORE_RECORD.size)))
+        else:
+            data = f.read()
+            data = data[:len(data) - len(data) % SCORE_RECORD.size]
+            rows = heapq.nlargest(n, (r for r in SCORE_RECORD.iter_unpack(data) if r[1] == diff))
+    return [
+        {"score": score, "difficulty": difficulties[d], "reason": REASON_CODES[reason],
+         "duration_s": duration, "time": when}
+        for score, d, reason, duration, when in rows
+    ]
+
+def print_top_scores(n, difficulty=None):
+    """--top-scores: list the best recorded rounds (one difficulty or all of them)."""
+    if difficulty is not None and difficulty not in difficulties:
+        arg_parser.error(f"--difficulty must be one of {', '.join(difficulties)}")
+    for name in [difficulty] if difficulty else difficulties:
+        print(f"{name} top {n}:")
+        rows = query_top_scores(n, name)
+        if not rows:
+            print("  (no rounds recorded)")
+        for i, row in enumerate(rows):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["time"]))
+            print(f"  {i + 1:3}. {row['score']:8}  {row['reason']:<4}  "
+                  f"{row['duration_s']:7.1f}s  {when}")
+
+# Tool mode: print the high-score table from --data-dir and exit
+if ARGS.top_scores is not None:
+    print_top_scores(max(1, ARGS.top_scores), ARGS.difficulty)
+    pygame.quit()
+    sys.exit()
+
+class TelemetryWriter:
+    """
+    Background writer for round telemetry and high scores.
+    submit() just queues the record; a daemon thread groups records into
+    batches and does one append per file per batch.
+    """
+    def __init__(self, score_index, record_count):
+        self.queue = queue.Queue()
+        self.score_index = score_index
+        self.record_count = record_count
+        self.thread = threading.Thread(target=self.run, name="telemetry-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, record):
+        self.queue.put(record)
+
+    def close(self):
+        """Flush whatever is queued and stop the thread (call once on exit)."""
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+
+    def run(self):
+        done = False
+        while not done:
+            # Block for the first record, then gather more until the batch
+            # is full or the flush interval runs out
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + TELEMETRY_FLUSH_SECS
+            while batch[-1] is not None and len(batch) < TELEMETRY_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                done = True
+                batch.pop()
+            if batch:
+                try:
+                    self.write_batch(batch)
+                except OSError as e:
+                    # Losing telemetry must never take the game down
+                    print(f"[telemetry] write failed: {e}")
+
+    def write_batch(self, batch):
+        os.makedirs(DATA_DIR, exist_ok=True)
+
+        with open(TELEMETRY_PATH, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in batch))
+
+        packed = []
+        for record in batch:
+            diff = difficulties.index(record["difficulty"])
+            packed.append(SCORE_RECORD.pack(
+                record["score"], diff, REASON_CODES.index(record["reason"]),
+                record["duration_s"], record["time"]))
+            while len(self.score_index) <= diff:
+                self.score_index.append([])
+            entries = self.score_index[diff]
+            entries.append((record["score"], self.record_count))
+            entries.sort(reverse=True)
+            del entries[SCORE_INDEX_SIZE:]
+            self.record_count += 1
+        with open(SCORES_PATH, "ab") as f:
+            f.write(b"".join(packed))
+
+        save_score_index(self.score_index, self.record_count)
+
+def frame_time_summary(frame_times):
+    """mean / p50 / p95 / p99 / max of a list of times in ms."""
+    if not frame_times:
+        return {}
+    ordered = sorted(frame_times)
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 2)
+    return {
+        "frames": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "max": round(ordered[-1], 2),
+    }
+
+# Load the existing table once at startup. The writer thread owns the
+# on-disk index from here on; the game keeps its own small copy of the
+# best scores so the game over screen never touches the disk.
+telemetry_writer = None
+high_scores = {name: [] for name in difficulties}   # difficulty -> best scores, best first
+if TELEMETRY_ENABLED:
+    startup_index, startup_records = load_score_index(len(difficulties))
+    for diff, entries in enumerate(startup_index[:len(difficulties)]):
+        high_scores[difficulties[diff]] = [score for score, _ in entries[:HIGH_SCORES_SHOWN]]
+    telemetry_writer = TelemetryWriter(startup_index, startup_records)
+
+def finish_round():
+    """
+    Send this round's telemetry / high-score record (once per round).
+    Called when the game ends or the window is closed mid-round.
+    """
+    global round_active
+    if not round_active:
+        return
+    round_active = False
+
+    difficulty = difficulties[diff_index]
+    if SHOW_PERF or difficulty == "SWARM":
+        seconds = max(0.001, (pygame.time.get_ticks() - round_start) / 1000)
+        print(f"[perf] {difficulty} {round_aliens} aliens: "
+              f"{round_ticks / seconds:.1f} ticks/s, frame ms {frame_time_summary(round_frame_times)}")
+
+    table = high_scores[difficulty]
+    table.append(score)
+    table.sort(reverse=True)
+    del table[HIGH_SCORES_SHOWN:]
+
+    if telemetry_writer is None:
+        return
+    telemetry_writer.submit({
+        "time": time.time(),
+        "round": rounds_played,
+        "difficulty": difficulty,
+        "score": score,
+        "duration_s": round((pygame.time.get_ticks() - round_start) / 1000, 3),
+        "shots_fired": shots_fired,
+        "hits": round_hits,
+        "reason": game_over_reason or "quit",
+        "frame_ms": frame_time_summary(round_frame_times),
+        "input_latency_ms": round_latencies.summary(),
+    })
+
 # ---------------------------
 # CLASS: Spaceship (the player)
 # ---------------------------
 class Spaceship(pygame.sprite.Sprite):
     def __init__(self, x, y, health):
         super().__init__()
+        track_sprite(self)
         # Load the player ship image
-        self.image = pygame.image.load("img/spaceship.png")
+        self.image = load_image("spaceship")
         # Set its rectangle so we can position and collide it
         self.rect = self.image.get_rect(center=(x, y))
+        # Mask is used for pixel-perfect collisions. Shared and built once:
+        # rebuilding it locks the Surface, which would race with the
+        # drawing thread in --pipelined mode
+        self.mask = load_mask("spaceship")
 
         # Store health
         self.health_start = health
@@ -195,10 +1105,9 @@ class Spaceship(pygame.sprite.Sprite):
         Handle:
         - movement (arrow keys / A-D equiv using LEFT/RIGHT)
         - shooting (spacebar)
-        - drawing health bar
         - checking if dead
         """
-        global game_state, game_over_reason
+        global player_dying, shots_fired
 
         # Get keyboard state
         key = pygame.key.get_pressed()
@@ -218,31 +1127,25 @@ class Spaceship(pygame.sprite.Sprite):
             bullet = PlayerBullet(self.rect.centerx, self.rect.top)  # create bullet at ship nose
             bullet_group.add(bullet)  # add to the sprite group so game updates/draws it
             self.last_shot = now      # reset cooldown timer
+            shots_fired += 1
 
-        # Mask is used for pixel-perfect collisions
-        self.mask = pygame.mask.from_surface(self.image)
+        if self.health_remaining <= 0:
+            # Health hit 0 -> Player dies. The round ends once the explosion
+            # (and its debris) has played out, see simulate_tick
+            spawn_explosion(self.rect.centerx, self.rect.centery, 3)
+            self.kill()  # remove ship from its sprite group
+            player_dying = True
 
-        # Draw the health bar just under the ship
+    def health_bar(self):
+        """
+        The health bar just under the ship, as (color, rect) pairs:
+        red = full bar background, green = remaining health portion.
+        """
         bar_w = self.rect.width
         bar_x = self.rect.x
         bar_y = self.rect.bottom + 6   # small gap below ship
-
-        # Red = full bar background
-        pygame.draw.rect(screen, RED, (bar_x, bar_y, bar_w, 10))
-
-        # Green = remaining health portion
-        if self.health_remaining > 0:
-            pygame.draw.rect(
-                screen,
-                GREEN,
-                (bar_x, bar_y, int(bar_w * (self.health_remaining / self.health_start)), 10)
-            )
-        else:
-            # Health hit 0 -> Player dies
-            explosion_group.add(Explosion(self.rect.centerx, self.rect.centery, 3))
-            self.kill()  # remove ship from its sprite group
-            game_state = STATE_GAMEOVER
-            game_over_reason = "lose"
+        green_w = int(bar_w * (self.health_remaining / self.health_start))
+        return ((RED, (bar_x, bar_y, bar_w, 10)), (GREEN, (bar_x, bar_y, green_w, 10)))
 
 # ---------------------------
 # CLASS: PlayerBullet
@@ -250,9 +1153,13 @@ class Spaceship(pygame.sprite.Sprite):
 class PlayerBullet(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
+        track_sprite(self)
         # Bullet sprite
-        self.image = pygame.image.load("img/bullet.png")
+        self.image = load_image("bullet")
         self.rect = self.image.get_rect(center=(x, y))
+        # Without a mask, collide_mask makes one from the image on every check
+        # (and locks the Surface while the drawing thread may be blitting it)
+        self.mask = load_mask("bullet")
 
     def update(self):
         """
@@ -260,7 +1167,7 @@ class PlayerBullet(pygame.sprite.Sprite):
         check collision with aliens and UFO,
         award points and spawn explosions.
         """
-        global score
+        global score, round_hits
 
         # Move bullet up the screen
         self.rect.y += BULLET_SPEED_PLAYER
@@ -270,14 +1177,19 @@ class PlayerBullet(pygame.sprite.Sprite):
             self.kill()
             return
 
-        # Check collision with aliens
-        hits = pygame.sprite.spritecollide(self, alien_group, True, pygame.sprite.collide_mask)
+        # Check collision with aliens: cheap rect test first, pixel-perfect
+        # mask test only on the few aliens the bullet actually overlaps
+        # (this matters with thousands of aliens in SWARM mode)
+        near = pygame.sprite.spritecollide(self, alien_group, False)
+        hits = [alien for alien in near if pygame.sprite.collide_mask(self, alien)]
+        alien_group.remove(*hits)
         if hits:
             self.kill()
             explosion_fx.play()
             for alien in hits:
-                explosion_group.add(Explosion(self.rect.centerx, self.rect.centery, 2))
+                spawn_explosion(self.rect.centerx, self.rect.centery, 2)
                 score += POINTS_TABLE.get(alien.alien_type, 0)
+                round_hits += 1
 
         # Check collision with UFO (red saucer, 100 pts)
         hits_ufo = pygame.sprite.spritecollide(self, ufo_group, True, pygame.sprite.collide_mask)
@@ -285,23 +1197,30 @@ class PlayerBullet(pygame.sprite.Sprite):
             self.kill()
             explosion_fx.play()
             for ufo in hits_ufo:
-                explosion_group.add(Explosion(self.rect.centerx, self.rect.centery, 2))
+                spawn_explosion(self.rect.centerx, self.rect.centery, 2)
                 score += POINTS_TABLE.get(ufo.alien_type, 0)
+                round_hits += 1
 
 # ---------------------------
 # CLASS: Alien (one invader)
 # ---------------------------
 class Alien(pygame.sprite.Sprite):
-    def __init__(self, x, y, alien_type):
+    def __init__(self, x, y, alien_type, art=None):
         """
         alien_type picks which sprite and how many points it's worth.
         1 = weak (10 pts), 2 = mid (20), 3 = strong (40)
+        art is an optional shared (image, mask) pair, used for shrunken
+        swarm formations so thousands of aliens don't each load a copy.
         """
         super().__init__()
+        track_sprite(self)
         self.alien_type = alien_type
-        self.image = pygame.image.load(f"img/alien{alien_type}.png")
+        if art is None:
+            self.image = load_image(f"alien{alien_type}")
+            self.mask = load_mask(f"alien{alien_type}")
+        else:
+            self.image, self.mask = art
         self.rect = self.image.get_rect(center=(x, y))
-        self.mask = pygame.mask.from_surface(self.image)
 
     def shift(self, dx, dy):
         """
@@ -320,10 +1239,11 @@ class UFO(pygame.sprite.Sprite):
         Spawns just off the left of the screen and drifts across slowly.
         """
         super().__init__()
+        track_sprite(self)
         self.alien_type = 4  # 100 pts value
-        self.image = pygame.image.load("img/alien4.png")
+        self.image = load_image("alien4")
         self.rect = self.image.get_rect(midleft=(-60, y))
-        self.mask = pygame.mask.from_surface(self.image)
+        self.mask = load_mask("alien4")
 
     def update(self):
         # Move UFO horizontally to the right
@@ -339,9 +1259,11 @@ class UFO(pygame.sprite.Sprite):
 class AlienBullet(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
+        track_sprite(self)
         # Alien bullet sprite
-        self.image = pygame.image.load("img/alien_bullet.png")
+        self.image = load_image("alien_bullet")
         self.rect = self.image.get_rect(center=(x, y))
+        self.mask = load_mask("alien_bullet")  # see PlayerBullet
 
     def update(self):
         """
@@ -361,7 +1283,7 @@ class AlienBullet(pygame.sprite.Sprite):
             explosion2_fx.play()
             for ship in hit_ship:
                 ship.health_remaining -= 1
-            explosion_group.add(Explosion(self.rect.centerx, self.rect.centery, 1))
+            spawn_explosion(self.rect.centerx, self.rect.centery, 1)
 
 # ---------------------------
 # CLASS: Explosion animation
@@ -373,16 +1295,9 @@ class Explosion(pygame.sprite.Sprite):
         size 1 = tiny pop, size 3 = big boom.
         """
         super().__init__()
-        self.images = []
-        for num in range(1, 6):
-            img = pygame.image.load(f"img/exp{num}.png")
-            if size == 1:
-                img = pygame.transform.scale(img, (20, 20))
-            elif size == 2:
-                img = pygame.transform.scale(img, (40, 40))
-            elif size == 3:
-                img = pygame.transform.scale(img, (120, 120))
-            self.images.append(img)
+        track_sprite(self)
+        # Frames are loaded and scaled once, then shared by every explosion
+        self.images = explosion_frames(size)
 
         # Animation bookkeeping
         self.index = 0
@@ -394,7 +1309,7 @@ class Explosion(pygame.sprite.Sprite):
         """
         Step through explosion frames over time.
         """
-        explosion_speed = 3  # lower = slower animation
+        explosion_speed = EXPLOSION_SPEED  # lower = faster animation
         self.counter += 1
 
         # Every few ticks, advance to the next frame
@@ -407,6 +1322,139 @@ class Explosion(pygame.sprite.Sprite):
         if self.index >= len(self.images) - 1 and self.counter >= explosion_speed:
             self.kill()
 
+# ---------------------------
+# Effects engine (batched explosions + debris)
+# ---------------------------
+# Instead of one Explosion sprite per explosion, every active effect is a
+# slot in preallocated NumPy arrays (position, frame, timer, size). One
+# vectorized update per tick advances all of them, and their blits go out
+# in the same Surface.blits call as the sprites. The player death (size 3)
+# explosion also throws debris particles, kept the same way.
+# Without NumPy (or with --sprite-explosions) we use Explosion sprites.
+EFFECTS_CAPACITY = 1024       # max explosions at once (extra ones are dropped)
+DEBRIS_CAPACITY  = 2048       # max debris particles at once
+DEBRIS_PER_DEATH = 64         # particles thrown by a size 3 explosion
+DEBRIS_SPEED     = 4.0        # max initial speed, px/tick
+DEBRIS_GRAVITY   = 0.15       # px/tick^2, pulls debris down the screen
+DEBRIS_LIFE      = (30, 60)   # ticks a particle lives (random in this range)
+DEBRIS_COLORS    = [(255, 220, 120), (255, 140, 40), (200, 60, 20)]
+
+class EffectsEngine:
+    def __init__(self):
+        # Explosions: the frame tables are indexed by size code (1, 2, 3)
+        self.frames = [None] + [explosion_frames(size) for size in sorted(EXPLOSION_SIZES)]
+        self.half = np.array([0] + [EXPLOSION_SIZES[size] // 2 for size in sorted(EXPLOSION_SIZES)],
+                             dtype=np.int32)
+        self.last_frame = EXPLOSION_FRAMES - 1
+        self.x = np.zeros(EFFECTS_CAPACITY, dtype=np.int32)
+        self.y = np.zeros(EFFECTS_CAPACITY, dtype=np.int32)
+        self.frame = np.zeros(EFFECTS_CAPACITY, dtype=np.int32)
+        self.timer = np.zeros(EFFECTS_CAPACITY, dtype=np.int32)
+        self.size = np.zeros(EFFECTS_CAPACITY, dtype=np.int32)
+        self.active = np.zeros(EFFECTS_CAPACITY, dtype=bool)
+
+        # Debris: tiny squares with velocity, gravity and a lifetime
+        self.debris_images = []
+        for color in DEBRIS_COLORS:
+            img = pygame.Surface((3, 3)).convert()
+            img.fill(color)
+            self.debris_images.append(img)
+        self.debris_pos = np.zeros((DEBRIS_CAPACITY, 2), dtype=np.float32)
+        self.debris_vel = np.zeros((DEBRIS_CAPACITY, 2), dtype=np.float32)
+        self.debris_life = np.zeros(DEBRIS_CAPACITY, dtype=np.int32)
+        self.debris_color = np.zeros(DEBRIS_CAPACITY, dtype=np.int32)
+        self.debris_active = np.zeros(DEBRIS_CAPACITY, dtype=bool)
+
+    def spawn(self, x, y, size):
+        """Start an explosion centered on (x, y); same sizes as Explosion."""
+        slot = int(np.argmin(self.active))   # first free slot
+        if self.active[slot]:
+            return                           # full: drop it rather than grow
+        self.x[slot] = x
+        self.y[slot] = y
+        self.frame[slot] = 0
+        self.timer[slot] = 0
+        self.size[slot] = size
+        self.active[slot] = True
+        if size == 3:
+            self.spawn_debris(x, y, DEBRIS_PER_DEATH)
+
+    def spawn_debris(self, x, y, count):
+        """Throw up to count particles out from (x, y) in random directions."""
+        free = np.flatnonzero(~self.debris_active)[:count]
+        n = len(free)
+        if n == 0:
+            return
+        angle = np.random.uniform(0, 2 * np.pi, n)
+        speed = np.random.uniform(0.5, DEBRIS_SPEED, n)
+        self.debris_pos[free] = (x, y)
+        self.debris_vel[free, 0] = np.cos(angle) * speed
+        self.debris_vel[free, 1] = np.sin(angle) * speed
+        self.debris_life[free] = np.random.randint(DEBRIS_LIFE[0], DEBRIS_LIFE[1], n)
+        self.debris_color[free] = np.random.randint(0, len(self.debris_images), n)
+        self.debris_active[free] = True
+
+    def update(self):
+        """Advance every explosion and particle by one tick (same timing as Explosion.update)."""
+        # Every EXPLOSION_SPEED ticks, step to the next frame; once the last
+        # frame has been shown that long, the slot is free again
+        self.timer += self.active
+        advance = self.active & (self.timer >= EXPLOSION_SPEED) & (self.frame < self.last_frame)
+        self.frame += advance
+        self.timer[advance] = 0
+        self.active &= ~((self.frame >= self.last_frame) & (self.timer >= EXPLOSION_SPEED))
+
+        live = self.debris_active
+        if not live.any():
+            return
+        self.debris_pos[live] += self.debris_vel[live]
+        self.debris_vel[live, 1] += DEBRIS_GRAVITY
+        self.debris_life -= live
+        self.debris_active &= self.debris_life > 0
+
+    def blits(self):
+        """(surface, (x, y)) pairs for everything active, explosions then debris."""
+        idx = np.flatnonzero(self.active)
+        sizes = self.size[idx]
+        half = self.half[sizes]
+        lefts = (self.x[idx] - half).tolist()
+        tops = (self.y[idx] - half).tolist()
+        frames = self.frames
+        blits = [(frames[size][frame], (left, top)) for size, frame, left, top
+                 in zip(sizes.tolist(), self.frame[idx].tolist(), lefts, tops)]
+
+        didx = np.flatnonzero(self.debris_active)
+        pos = self.debris_pos[didx].astype(np.int32).tolist()
+        images = self.debris_images
+        blits.extend((images[color], (x, y)) for color, (x, y)
+                     in zip(self.debris_color[didx].tolist(), pos))
+        return blits
+
+    def clear(self):
+        self.active[:] = False
+        self.debris_active[:] = False
+
+    def counts(self):
+        """(active explosions, active debris particles)"""
+        return int(self.active.sum()), int(self.debris_active.sum())
+
+effects = None
+if np is not None and not ARGS.sprite_explosions:
+    effects = EffectsEngine()
+
+def spawn_explosion(x, y, size):
+    """Start an explosion: in the effects engine if we have one, else as a sprite."""
+    if effects is not None:
+        effects.spawn(x, y, size)
+    else:
+        explosion_group.add(Explosion(x, y, size))
+
+def update_effects():
+    """Per-tick explosion / debris update."""
+    explosion_group.update()
+    if effects is not None:
+        effects.update()
+
 # ---------------------------
 # Alien formation helpers
 # ---------------------------
@@ -477,32 +1525,57 @@ def check_player_loss_by_invasion():
 # ---------------------------
 # Level setup helpers
 # ---------------------------
-def create_aliens():
+def formation_art(a_type, max_w, max_h):
+    """
+    Shared (image, mask) for an alien type shrunk to fit a max_w x max_h
+    cell, or None if the normal sprite already fits.
+    """
+    img = load_image(f"alien{a_type}")
+    w, h = img.get_size()
+    if w <= max_w and h <= max_h:
+        return None
+    scale = min(max_w / w, max_h / h)
+    img = pygame.transform.smoothscale(img, (max(2, int(w * scale)), max(2, int(h * scale))))
+    return img, pygame.mask.from_surface(img)
+
+def create_aliens(rows=ROWS, cols=COLS):
     """
     Populate alien_group with a grid of aliens in rows/cols.
     Rows closer to the player are worth more points.
+    Large grids get tighter spacing and shrunken sprites so they
+    still fit in the formation area.
     """
     alien_group.empty()
 
     # Positioning for alien grid
-    start_x = 120
-    start_y = 100
-    x_gap  = 70
-    y_gap  = 50
-
-    for row in range(ROWS):
-        # Decide alien type for this row (controls sprite + score)
-        if row <= 1:
-            a_type = 1   # top rows -> weak alien (10 pts)
-        elif row <= 3:
-            a_type = 2   # middle rows -> medium alien (20 pts)
+    start_x = FORMATION_X
+    start_y = FORMATION_Y
+    # Gaps can be fractions of a pixel for very large grids (more columns
+    # than FORMATION_W pixels); each alien's position is rounded instead
+    x_gap  = min(ALIEN_X_GAP, FORMATION_W / cols)
+    y_gap  = min(ALIEN_Y_GAP, FORMATION_H / rows)
+
+    # One shared image per type (leave a 1px gap between neighbours)
+    art = {a_type: formation_art(a_type, max(2, int(x_gap) - 2), max(2, int(y_gap) - 2))
+           for a_type in (1, 2, 3)}
+
+    aliens = []
+    for row in range(rows):
+        # Decide alien type for this row (controls sprite + score):
+        # top 40% of rows -> weak alien (10 pts), next 40% -> medium
+        # alien (20 pts), the rest -> strong alien (40 pts)
+        if row < rows * 0.4:
+            a_type = 1
+        elif row < rows * 0.8:
+            a_type = 2
         else:
-            a_type = 3   # bottom row -> strong alien (40 pts)
+            a_type = 3
 
-        for col in range(COLS):
-            x = start_x + col * x_gap
-            y = start_y + row * y_gap
-            alien_group.add(Alien(x, y, a_type))
+        for col in range(cols):
+            x = round(start_x + col * x_gap)
+            y = round(start_y + row * y_gap)
+            aliens.append(Alien(x, y, a_type, art[a_type]))
+    alien_group.add(*aliens)
 
 def reset_game(selected_diff_name):
     """
@@ -517,14 +1590,28 @@ def reset_game(selected_diff_name):
         - how far down they drop (alien_step_down)
     """
     global score, countdown, last_count, last_alien_shot, last_ufo_spawn
-    global can_shoot
+    global can_shoot, player_dying, dying_ticks
     global alien_dir, alien_move_delay, alien_move_timer, alien_step_down
+    global rounds_played, round_active, round_start, shots_fired, round_hits, round_frame_times
+    global round_ticks, round_aliens, next_tick_at, last_render_list
+    global alien_cooldown, alien_bullet_limit, alien_volley, ufo_cooldown, ufo_limit
 
     # Reset scoreboard and countdown
     score = 0
     countdown = 3
     last_count = pygame.time.get_ticks()
     can_shoot = False  # important: lock shooting until countdown finishes
+    player_dying = False
+    dying_ticks = 0
+
+    # Reset per-round telemetry
+    round_active = True
+    round_start = pygame.time.get_ticks()
+    shots_fired = 0
+    round_hits = 0
+    round_frame_times = []
+    round_latencies.clear()
+    round_ticks = 0
 
     # Reset alien/UFO timers
     last_alien_shot = pygame.time.get_ticks()
@@ -541,9 +1628,26 @@ def reset_game(selected_diff_name):
     elif selected_diff_name == "MEDIUM":
         alien_move_delay = 18
         alien_step_down  = 24
-    else:  # "HARD"
+    elif selected_diff_name == "HARD":
         alien_move_delay = 8   # tiny delay = fast marching
         alien_step_down  = 32  # big drop per bounce
+    else:  # "SWARM"
+        alien_move_delay = 20
+        alien_step_down  = 8   # the formation is huge, so drop gently
+
+    # Fire limits: classic unless we're stress testing
+    if selected_diff_name == "SWARM":
+        alien_cooldown     = SWARM_ALIEN_COOLDOWN
+        alien_bullet_limit = SWARM_BULLET_LIMIT
+        alien_volley       = SWARM_ALIEN_VOLLEY
+        ufo_cooldown       = SWARM_UFO_COOLDOWN
+        ufo_limit          = SWARM_UFO_LIMIT
+    else:
+        alien_cooldown     = ALIEN_COOLDOWN
+        alien_bullet_limit = ALIEN_BULLET_LIMIT
+        alien_volley       = 1
+        ufo_cooldown       = UFO_COOLDOWN
+        ufo_limit          = UFO_LIMIT
 
     # Clear all sprite groups
     spaceship_group.empty()
@@ -552,13 +1656,34 @@ def reset_game(selected_diff_name):
     alien_bullet_group.empty()
     explosion_group.empty()
     ufo_group.empty()
+    if effects is not None:
+        effects.clear()
 
     # Spawn player at bottom middle with 3 health "lives"
-    ship = Spaceship(SCREEN_W // 2, SCREEN_H - 80, 3)
+    # (a lot more in SWARM mode, where hundreds of bullets are in the air)
+    health = SWARM_SHIP_HEALTH if selected_diff_name == "SWARM" else 3
+    ship = Spaceship(SCREEN_W // 2, SCREEN_H - 80, health)
     spaceship_group.add(ship)
 
     # Spawn alien formation
-    create_aliens()
+    if selected_diff_name == "SWARM":
+        create_aliens(SWARM_ROWS, SWARM_COLS)
+    else:
+        create_aliens()
+
+    round_aliens = len(alien_group)
+
+    # Drop any frame the simulation thread left over from the last round
+    render_buffer.clear()
+    last_render_list = None
+    next_tick_at = time.perf_counter()  # first tick is due right away
+
+    # Memory tracking samples once the new round is fully set up,
+    # so the numbers are comparable from one sample to the next
+    rounds_played += 1
+    if MEMORY_TRACKING and rounds_played % MEMORY_SAMPLE_ROUNDS == 0:
+        sample_memory(rounds_played)
+    trace_next_round()
 
 # ---------------------------
 # Screen drawing helpers for menus / game over
@@ -573,12 +1698,12 @@ def draw_title_screen():
 
     rows_y = [200, 240, 280, 320]  # vertical positions for the legend rows
     pt_vals = ["    10 PTS", "    20 PTS", "    40 PTS", "   100 PTS"]
-    alien_imgs = ["alien1.png", "alien2.png", "alien3.png", "alien4.png"]
+    alien_imgs = ["alien1", "alien2", "alien3", "alien4"]
 
     for i, y in enumerate(rows_y):
         # Draw alien sprite
         try:
-            img = pygame.image.load("img/" + alien_imgs[i])
+            img = load_image(alien_imgs[i])
             img_rect = img.get_rect()
             img_rect.centerx = SCREEN_W // 2 - 70
             img_rect.centery = y
@@ -604,7 +1729,7 @@ def draw_difficulty_screen(selected_i):
         color = WHITE if i == selected_i else (100, 100, 100)
         draw_text_center(name, font32, color, 260 + i * 40)
 
-    draw_text_center("ARROWS TO MOVE  •  ENTER TO START", font16, WHITE, 380)
+    draw_text_center("ARROWS TO MOVE  •  ENTER TO START", font16, WHITE, 260 + len(difficulties) * 40)
 
 def draw_gameover_screen(reason):
     """
@@ -621,16 +1746,295 @@ def draw_gameover_screen(reason):
     draw_text_center("PRESS ENTER TO PLAY AGAIN", font24, WHITE, SCREEN_H // 2 + 10)
     draw_text_center(f"SCORE: {score}", font24, WHITE, SCREEN_H // 2 + 50)
 
+    # Best scores for the difficulty just played
+    best = high_scores[difficulties[diff_index]]
+    if best:
+        draw_text_center("HIGH SCORES", font20, WHITE, SCREEN_H // 2 + 100)
+        for i, value in enumerate(best):
+            draw_text_center(f"{i + 1}. {value}", font16, WHITE, SCREEN_H // 2 + 130 + i * 22)
+
+# ---------------------------
+# Gameplay tick: simulation -> render list -> drawing
+# ---------------------------
+# One gameplay frame is split in two halves:
+#   simulate_tick()     moves everything, handles collisions and scoring, and
+#                       returns a RenderList: an immutable snapshot of what to draw
+#   draw_render_list()  blits that snapshot, renders the HUD text and flips
+# simulate_tick never touches the screen, so it can run on another thread
+# (--pipelined) while the main thread is still drawing the previous tick.
+#
+# blits   -- (surface, (x, y)) for every sprite, in draw order
+# rects   -- (color, (x, y, w, h)) filled rects (health bar), drawn under the sprites
+# texts   -- ("center", text, font, color, y) or ("topleft", text, font, color, (x, y))
+# sampled_at -- when the input behind this tick was read (latency stats)
+# counts  -- (aliens, alien bullets, UFOs, effects.counts() or None) for the perf HUD
+RenderList = namedtuple("RenderList", "blits rects texts sampled_at counts")
+
+def build_render_list(texts, sampled_at):
+    """Snapshot the health bar and all sprite images / positions."""
+    blits = []
+    for group in (spaceship_group, bullet_group, alien_group,
+                  alien_bullet_group, ufo_group, explosion_group):
+        blits.extend((sprite.image, sprite.rect.topleft) for sprite in group)
+    if effects is not None:
+        blits.extend(effects.blits())
+    rects = tuple(bar for ship in spaceship_group for bar in ship.health_bar())
+    counts = (len(alien_group), len(alien_bullet_group), len(ufo_group),
+              effects.counts() if effects is not None else None)
+    return RenderList(tuple(blits), rects, tuple(texts), sampled_at, counts)
+
+def draw_render_list(render_list):
+    """Draw one simulated tick (main thread only)."""
+    draw_bg()
+    for color, rect in render_list.rects:
+        if rect[2] > 0:
+            pygame.draw.rect(screen, color, rect)
+    screen.blits(render_list.blits, doreturn=False)
+    for kind, text, font, color, pos in render_list.texts:
+        if kind == "center":
+            draw_text_center(text, font, color, pos)
+        else:
+            draw_text_topleft(text, font, color, *pos)
+    draw_latency_hud()
+    draw_perf_hud(render_list.counts)
+
+def simulate_tick():
+    """
+    Advance the round by one frame.
+    Returns the RenderList for this frame, or None if the round ended
+    before anything was drawn (aliens landed / all aliens dead /
+    the death explosion finished).
+    """
+    global countdown, last_count, can_shoot, round_start, round_ticks
+    global last_alien_shot, last_ufo_spawn, alien_move_timer
+    global game_state, game_over_reason, dying_ticks
+    global tick_rate, tick_rate_start, tick_rate_count
+
+    round_ticks += 1
+    tick_rate_count += 1
+    now_s = time.perf_counter()
+    if now_s - tick_rate_start >= 1.0:
+        tick_rate = tick_rate_count / (now_s - tick_rate_start)
+        tick_rate_start = now_s
+        tick_rate_count = 0
+
+    # -------------------
+    # DYING PHASE
+    # -------------------
+    # The ship is gone: freeze the invaders and let the death explosion and
+    # debris play out on the playfield, then it's GAME OVER
+    if player_dying:
+        dying_ticks += 1
+        effects_left = len(explosion_group)
+        if effects is not None:
+            effects_left += sum(effects.counts())
+        if effects_left == 0 or dying_ticks > DEATH_ANIMATION_TICKS:
+            game_state = STATE_GAMEOVER
+            game_over_reason = "lose"
+            return None
+
+        sampled_at = sample_input()
+        bullet_group.update()
+        alien_bullet_group.update()
+        ufo_group.update()
+        update_effects()
+        texts = [("topleft", f"SCORE: {score}", font20, WHITE, (20, 20))]
+        return build_render_list(texts, sampled_at)
+
+    # -------------------
+    # COUNTDOWN PHASE
+    # -------------------
+    if countdown > 0:
+        # Update all sprites visually but DO NOT:
+        # - move aliens toward player
+        # - let aliens shoot
+        # - let player shoot (we locked can_shoot = False)
+        sampled_at = sample_input()
+        spaceship_group.update()
+        bullet_group.update()
+        alien_group.update()
+        alien_bullet_group.update()
+        ufo_group.update()
+        update_effects()
+
+        # Score in top-left corner, then big "GET READY" and countdown #
+        # on top (after sprites so it's visible)
+        texts = [
+            ("topleft", f"SCORE: {score}", font20, WHITE, (20, 20)),
+            ("center", "GET READY!", font48, WHITE, SCREEN_H // 2 - 30),
+            ("center", str(countdown), font48, WHITE, SCREEN_H // 2 + 30),
+        ]
+
+        # Tick down countdown once per second
+        now = pygame.time.get_ticks()
+        if now - last_count > 1000:
+            countdown -= 1
+            last_count = now
+
+            # When countdown hits 0 next frame, allow player shooting
+            if countdown <= 0:
+                # clamp it at 0 so it doesn't keep going negative
+                countdown = 0
+                # flip can_shoot on so player can fire
+                can_shoot = True
+                # round duration, tick rate, frame times and input
+                # latency are all measured from here
+                round_start = now
+                round_ticks = 0
+                round_frame_times.clear()
+                round_latencies.clear()
+
+        return build_render_list(texts, sampled_at)
+
+    # -------------------
+    # NORMAL GAMEPLAY PHASE
+    # -------------------
+
+    now = pygame.time.get_ticks()
+
+    # Aliens fire bullets sometimes (a volley of several at once in SWARM mode)
+    if (now - last_alien_shot > alien_cooldown and
+        len(alien_bullet_group) < alien_bullet_limit and len(alien_group) > 0):
+        shots = min(alien_volley, alien_bullet_limit - len(alien_bullet_group), len(alien_group))
+        for attacker in random.sample(alien_group.sprites(), shots):
+            alien_bullet_group.add(AlienBullet(attacker.rect.centerx, attacker.rect.bottom))
+        last_alien_shot = now
+
+    # Possibly spawn UFO (red saucer worth 100 pts)
+    if now - last_ufo_spawn > ufo_cooldown:
+        # 40% chance to spawn, only if there's room for another UFO
+        if random.random() < 0.4 and len(ufo_group) < ufo_limit:
+            ufo_group.add(UFO(UFO_LANES[len(ufo_group) % len(UFO_LANES)]))
+        last_ufo_spawn = now
+
+    # Control alien marching:
+    # alien_move_timer counts frames. When it reaches alien_move_delay,
+    # we step the whole block horizontally (and maybe drop down).
+    alien_move_timer += 1
+    if alien_move_timer >= alien_move_delay:
+        alien_move_timer = 0
+        move_alien_block(alien_move_speed_by_diff[difficulties[diff_index]])
+
+    # Check if aliens got low enough that the player auto-loses
+    # (the main loop draws GAME OVER immediately this frame)
+    check_player_loss_by_invasion()
+    if game_state == STATE_GAMEOVER:
+        return None
+
+    # Check for instant WIN:
+    # if no aliens remain and player ship still exists
+    if len(alien_group) == 0 and len(spaceship_group) > 0:
+        game_state = STATE_GAMEOVER
+        game_over_reason = "win"
+        return None
+
+    # Low-latency mode grabs the freshest keyboard state right
+    # before the ship reads it
+    sampled_at = sample_input()
+
+    # Normal per-frame sprite updates
+    spaceship_group.update()
+    bullet_group.update()
+    alien_group.update()
+    alien_bullet_group.update()
+    ufo_group.update()
+    update_effects()
+
+    # HUD: Score in top-left
+    texts = [("topleft", f"SCORE: {score}", font20, WHITE, (20, 20))]
+    return build_render_list(texts, sampled_at)
+
+# ---------------------------
+# Simulation thread (--pipelined)
+# ---------------------------
+# The simulation thread runs simulate_tick() and hands each RenderList to
+# the main thread through a double buffer: one list is being drawn while
+# the next one is being simulated. The simulation waits whenever a finished
+# list hasn't been taken yet, so it never runs more than one tick ahead,
+# and the main thread's frame pacing sets the tick rate.
+# Only the main thread touches the display and the event queue; the
+# simulation thread only runs while game_state == STATE_GAME, and
+# reset_game (main thread) is only called outside of that state.
+# When a round ends, the simulation finishes its tick and then hands over
+# ROUND_OVER; the main thread records the round only after receiving it.
+class RenderBuffer:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.ready = None       # finished RenderList waiting to be drawn
+        self.generation = 0     # bumped by clear() so stale lists get dropped
+        self.closed = False
+
+    def publish(self, render_list, generation):
+        """Hand over a finished list; waits while the previous one is still pending."""
+        with self.cond:
+            while self.ready is not None and not self.closed and generation == self.generation:
+                self.cond.wait()
+            if generation == self.generation and not self.closed:
+                self.ready = render_list
+                self.cond.notify_all()
+
+    def take(self, timeout):
+        """Return the next list to draw, or None if none arrived in time."""
+        with self.cond:
+            if self.ready is None:
+                self.cond.wait(timeout)
+            render_list, self.ready = self.ready, None
+            self.cond.notify_all()
+            return render_list
+
+    def clear(self):
+        """Forget the pending list and anything currently being simulated."""
+        with self.cond:
+            self.ready = None
+            self.generation += 1
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+# Handed over after the last tick of a round, instead of a RenderList
+ROUND_OVER = object()
+
+def run_simulation():
+    """Simulation thread body: tick whenever a round is in progress."""
+    while not render_buffer.closed:
+        if game_state != STATE_GAME:
+            time.sleep(0.005)
+            continue
+        if UNCAPPED and not tick_due():
+            time.sleep(0.001)  # frames are uncapped, ticks are not
+            continue
+        generation = render_buffer.generation
+        render_list = simulate_tick()
+        if render_list is not None:
+            render_buffer.publish(render_list, generation)
+        if game_state != STATE_GAME:
+            # The round ended during this tick. Only now (the tick is done,
+            # so score and stats are final) may the main thread record it.
+            render_buffer.publish(ROUND_OVER, generation)
+
+render_buffer = RenderBuffer()
+sim_thread = None
+if PIPELINED:
+    sim_thread = threading.Thread(target=run_simulation, name="simulation", daemon=True)
+    sim_thread.start()
+
 # ---------------------------
 # MAIN GAME LOOP
 # ---------------------------
 running = True
 while running:
-    clock.tick(FPS)  # Cap framerate
+    frame_ms = pace_frame()  # Cap framerate (or pace precisely in low-latency mode)
+    if game_state == STATE_GAME:
+        round_frame_times.append(frame_ms)
+        frame_window.append(frame_ms)
 
     # -----------------------
     # Input / events
     # -----------------------
+    input_sampled_at = time.perf_counter()
     for event in pygame.event.get():
         if event.type == QUIT:
             running = False  # Window close button exits game
@@ -655,7 +2059,8 @@ while running:
 
             elif game_state == STATE_GAMEOVER:
                 # From game over screen, Enter goes back to difficulty select
-                if event.key == K_RETURN:
+                # (once the round has been recorded)
+                if event.key == K_RETURN and not round_active:
                     game_state = STATE_DIFF
 
     # -----------------------
@@ -663,7 +2068,7 @@ while running:
     # -----------------------
     if game_state == STATE_TITLE:
         draw_title_screen()
-        pygame.display.update()
+        present()
         continue
 
     # -----------------------
@@ -671,137 +2076,65 @@ while running:
     # -----------------------
     if game_state == STATE_DIFF:
         draw_difficulty_screen(diff_index)
-        pygame.display.update()
+        present()
         continue
 
     # -----------------------
     # STATE: GAMEPLAY
     # -----------------------
-    if game_state == STATE_GAME:
-        draw_bg()  # draw background
-
-        # -------------------
-        # COUNTDOWN PHASE
-        # -------------------
-        if countdown > 0:
-            # Update all sprites visually but DO NOT:
-            # - move aliens toward player
-            # - let aliens shoot
-            # - let player shoot (we locked can_shoot = False)
-            spaceship_group.update()
-            bullet_group.update()
-            alien_group.update()
-            alien_bullet_group.update()
-            ufo_group.update()
-            explosion_group.update()
-
-            # Draw sprites to the screen
-            spaceship_group.draw(screen)
-            bullet_group.draw(screen)
-            alien_group.draw(screen)
-            alien_bullet_group.draw(screen)
-            ufo_group.draw(screen)
-            explosion_group.draw(screen)
-
-            # Draw score in top-left corner
-            draw_text_topleft(f"SCORE: {score}", font20, WHITE, 20, 20)
-
-            # Big "GET READY" and countdown # on top (after sprites so it's visible)
-            draw_text_center("GET READY!", font48, WHITE, SCREEN_H // 2 - 30)
-            draw_text_center(str(countdown), font48, WHITE, SCREEN_H // 2 + 30)
-
-            # Tick down countdown once per second
-            now = pygame.time.get_ticks()
-            if now - last_count > 1000:
-                countdown -= 1
-                last_count = now
-
-                # When countdown hits 0 next frame, allow player shooting
-                if countdown <= 0:
-                    # clamp it at 0 so it doesn't keep going negative
-                    countdown = 0
-                    # flip can_shoot on so player can fire
-                    can_shoot = True
-
-            pygame.display.update()
-            continue  # skip rest of gameplay logic until countdown is done
-
-        # -------------------
-        # NORMAL GAMEPLAY PHASE
-        # -------------------
-
-        now = pygame.time.get_ticks()
-
-        # Aliens fire bullets sometimes
-        if (now - last_alien_shot > ALIEN_COOLDOWN and
-            len(alien_bullet_group) < 4 and len(alien_group) > 0):
-            attacker = random.choice(alien_group.sprites())
-            alien_bullet_group.add(AlienBullet(attacker.rect.centerx, attacker.rect.bottom))
-            last_alien_shot = now
-
-        # Possibly spawn UFO (red saucer worth 100 pts)
-        if now - last_ufo_spawn > UFO_COOLDOWN:
-            # 40% chance to spawn, only if no UFO currently on screen
-            if random.random() < 0.4 and len(ufo_group) == 0:
-                ufo_group.add(UFO())
-            last_ufo_spawn = now
-
-        # Control alien marching:
-        # alien_move_timer counts frames. When it reaches alien_move_delay,
-        # we step the whole block horizontally (and maybe drop down).
-        alien_move_timer += 1
-        if alien_move_timer >= alien_move_delay:
-            alien_move_timer = 0
-            move_alien_block(alien_move_speed_by_diff[difficulties[diff_index]])
-
-        # Check if aliens got low enough that the player auto-loses
-        check_player_loss_by_invasion()
-        if game_state == STATE_GAMEOVER:
-            # Player lost because invaders reached the bottom.
-            # Draw GAME OVER immediately this frame.
-            draw_gameover_screen(game_over_reason)
-            pygame.display.update()
-            continue
+    # In pipelined mode the simulation thread may flip game_state to GAMEOVER
+    # in the middle of a tick, so we keep taking frames until it hands over
+    # ROUND_OVER (round_active stays True until then).
+    if game_state == STATE_GAME or (PIPELINED and round_active):
+        if PIPELINED:
+            # The simulation thread is already working on the next tick
+            render_list = render_buffer.take(timeout=0 if UNCAPPED else 0.1)
+            if render_list is ROUND_OVER:
+                finish_round()
+                render_list = None
+            elif render_list is not None:
+                last_render_list = render_list
+            elif UNCAPPED and last_render_list is not None:
+                render_list = last_render_list  # no new tick yet; draw the last one again
+            else:
+                continue  # simulation still busy; nothing new to show
+        elif UNCAPPED:
+            # Only tick when a fixed 1/FPS step is due; in between,
+            # draw the newest tick again
+            while tick_due():
+                last_render_list = simulate_tick()
+                if last_render_list is None:
+                    break  # round over
+            render_list = last_render_list
+        else:
+            render_list = simulate_tick()
 
-        # Check for instant WIN:
-        # if no aliens remain and player ship still exists
-        if len(alien_group) == 0 and len(spaceship_group) > 0:
-            game_state = STATE_GAMEOVER
-            game_over_reason = "win"
-            draw_gameover_screen(game_over_reason)
-            pygame.display.update()
+        if render_list is not None:
+            draw_render_list(render_list)
+            present(render_list.sampled_at)
             continue
-
-        # Normal per-frame sprite updates
-        spaceship_group.update()
-        bullet_group.update()
-        alien_group.update()
-        alien_bullet_group.update()
-        ufo_group.update()
-        explosion_group.update()
-
-        # Draw all active sprites
-        spaceship_group.draw(screen)
-        bullet_group.draw(screen)
-        alien_group.draw(screen)
-        alien_bullet_group.draw(screen)
-        ufo_group.draw(screen)
-        explosion_group.draw(screen)
-
-        # HUD: Score in top-left
-        draw_text_topleft(f"SCORE: {score}", font20, WHITE, 20, 20)
-
-        pygame.display.update()
-        continue
+        # No frame: the round just ended (fall through to GAME OVER
+        # so it shows this frame)
 
     # -----------------------
     # STATE: GAMEOVER SCREEN
     # -----------------------
     if game_state == STATE_GAMEOVER:
+        finish_round()  # no-op if this round was already recorded
         draw_gameover_screen(game_over_reason)
-        pygame.display.update()
+        present()
         continue
 
 # If we ever exit the main loop, quit pygame safely
+if sim_thread is not None:
+    render_buffer.close()
+    sim_thread.join(timeout=1)
+finish_round()  # window closed mid-round still counts as a round
+if telemetry_writer is not None:
+    telemetry_writer.close()
+if MEMORY_TRACKING:
+    sample_memory(rounds_played)  # final report for the session
+if (LOW_LATENCY or SHOW_LATENCY) and session_latencies.frames:
+    print(f"[latency] input-to-present ms: {session_latencies.summary()}")
 pygame.quit()
 sys.exit()